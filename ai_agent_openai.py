@@ -151,24 +151,24 @@ class OpenAIJobAgent:
                 return result.data[0]
             else:
                 conn = get_db_connection()
-                if self.user_id:
-                    job_df = pd.read_sql_query(
-                        "SELECT * FROM jobs WHERE id = ? AND user_id = ?", 
-                        conn, 
-                        params=(job_id, self.user_id)
-                    )
-                else:
-                    job_df = pd.read_sql_query(
-                        "SELECT * FROM jobs WHERE id = ?", 
-                        conn, 
-                        params=(job_id,)
-                    )
-                conn.close()
+                try:
+                    # Single-row lookup: skip the DataFrame and zip the row with its columns
+                    if self.user_id:
+                        cursor = conn.execute(
+                            "SELECT * FROM jobs WHERE id = ? AND user_id = ?",
+                            (job_id, self.user_id)
+                        )
+                    else:
+                        cursor = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+                    row = cursor.fetchone()
+                    columns = [description[0] for description in cursor.description]
+                finally:
+                    conn.close()
                 
-                if job_df.empty:
+                if row is None:
                     return None
                 
-                return job_df.iloc[0].to_dict()
+                return dict(zip(columns, row))
         except Exception as e:
             st.error(f"Error getting job data: {str(e)}")
             return None
@@ -1118,19 +1118,8 @@ Remember: You're not just answering questions - you're helping the user succeed
                 
                 return pd.DataFrame(result.data) if result.data else pd.DataFrame()
             else:
-                conn = get_db_connection()
-                if self.user_id:
-                    jobs_df = pd.read_sql_query(
-                        "SELECT id, company_name, job_title, job_description, status, date_added FROM jobs WHERE user_id = ? ORDER BY date_added DESC",
-                        conn, params=(self.user_id,)
-                    )
-                else:
-                    jobs_df = pd.read_sql_query(
-                        "SELECT id, company_name, job_title, job_description, status, date_added FROM jobs ORDER BY date_added DESC",
-                        conn
-                    )
-                conn.close()
-                return jobs_df
+                from database_utils import get_jobs_overview
+                return get_jobs_overview(self.user_id)
         except Exception as e:
             st.error(f"Error getting jobs: {str(e)}")
             return pd.DataFrame()
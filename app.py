@@ -31,33 +31,27 @@ from dashboard_utils import prepare_dashboard_data, show_metrics, show_active_ap
 from user_portal import show_user_portal
 from jobs_portal import show_jobs_portal
 from ai_chatbot_portal_openai import show_openai_chatbot as show_ai_chatbot
-from login import show_login_page, init_auth_db
+from login import show_login_page
 
 
 # Load environment variables
 load_dotenv()
 
-# Initialize authentication database
-init_auth_db()
-
 # Initialize OpenAI client
 client = init_openai_client()
 if client is None:
     st.error("OpenAI client initialization failed. The AI Chat Bot feature will be disabled.")
 
-# Ensure required directories exist
-ensure_directories()
+@st.cache_resource(show_spinner=False)
+def _bootstrap_storage():
+    """Create the data directories and database tables once per process, not on every rerun."""
+    ensure_directories()
+    init_db()
+    return True
 
-# Initialize database
-init_db()
+_bootstrap_storage()
 
 # Initialize session state
-if 'jobs_data' not in st.session_state:
-    st.session_state.jobs_data = pd.DataFrame(columns=[
-        'company_name', 'job_title', 'job_description', 'application_url',
-        'status', 'sentiment', 'notes', 'date_added'
-    ])
-
 if 'documents' not in st.session_state:
     st.session_state.documents = pd.DataFrame(columns=[
         'document_name', 'document_type', 'upload_date', 'file_path'
@@ -1,5 +1,9 @@
 import sqlite3
+import queue
+import functools
+import json
 import pandas as pd
+from contextlib import contextmanager
 from datetime import datetime
 import streamlit as st
 import os
@@ -11,7 +15,8 @@ try:
         supabase_get_user_career_goals, supabase_add_job, supabase_add_document,
         supabase_add_career_goals, supabase_save_documents_to_database,
         supabase_update_user_profile, supabase_delete_document,
-        supabase_get_preferred_resume, supabase_get_user_stats
+        supabase_get_preferred_resume, supabase_get_user_stats,
+        get_supabase_credentials
     )
     SUPABASE_AVAILABLE = True
 except ImportError:
@@ -31,39 +36,9 @@ def use_supabase():
     if not SUPABASE_AVAILABLE:
         return False
     
-    # Check for Supabase credentials in multiple sources
-    has_credentials = False
-    
-    # 1. Check Streamlit secrets (works when running with streamlit run)
-    try:
-        if hasattr(st, 'secrets') and 'SUPABASE_URL' in st.secrets and 'SUPABASE_API_KEY' in st.secrets:
-            supabase_url = st.secrets.get('SUPABASE_URL', '').strip()
-            supabase_key = st.secrets.get('SUPABASE_API_KEY', '').strip()
-            if supabase_url and supabase_key:
-                has_credentials = True
-    except:
-        pass
-    
-    # 2. Check environment variables
-    if not has_credentials:
-        supabase_url = os.getenv('SUPABASE_URL', '').strip()
-        supabase_key = os.getenv('SUPABASE_API_KEY', '').strip()
-        has_credentials = bool(supabase_url and supabase_key)
-    
-    # 3. Check secrets.toml file directly (for local development)
-    if not has_credentials and os.path.exists('.streamlit/secrets.toml'):
-        try:
-            import toml
-            with open('.streamlit/secrets.toml', 'r') as f:
-                secrets = toml.load(f)
-                supabase_url = secrets.get('default', {}).get('SUPABASE_URL', '').strip()
-                supabase_key = secrets.get('default', {}).get('SUPABASE_API_KEY', '').strip()
-                has_credentials = bool(supabase_url and supabase_key)
-        except:
-            # toml package not available or file read error
-            pass
-    
-    return has_credentials
+    # Credentials are resolved once per process (secrets, env, then secrets.toml)
+    supabase_url, supabase_key = get_supabase_credentials()
+    return bool(supabase_url and supabase_key)
 
 def get_database_status():
     """Get current database backend status."""
@@ -72,9 +47,72 @@ def get_database_status():
     else:
         return "💾 SQLite - Local Database"
 
+DB_PATH = 'data/jobs.db'
+
+# Idle SQLite connections shared across Streamlit reruns and threads
+DB_POOL_SIZE = 8
+
+# How long a connection waits in SQLite's busy handler for another session's write lock
+DB_BUSY_TIMEOUT_SECONDS = 5.0
+
+@st.cache_resource
+def _get_connection_pool():
+    """Get the process-wide pool of idle SQLite connections.
+    
+    Held as a Streamlit resource so the open connections survive module reloads
+    and are shared by every session, rather than one connection per rerun.
+    """
+    return queue.Queue(maxsize=DB_POOL_SIZE)
+
+def _apply_connection_pragmas(conn):
+    """Tune a new SQLite connection: WAL journal, NORMAL sync, in-memory temp tables, 64MB cache."""
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-65536')
+    return conn
+
 def get_db_connection():
     """Get SQLite database connection."""
-    return sqlite3.connect('data/jobs.db')
+    return _apply_connection_pragmas(sqlite3.connect(DB_PATH, timeout=DB_BUSY_TIMEOUT_SECONDS))
+
+def _create_pooled_connection():
+    """Open a SQLite connection tuned for reuse from the pool."""
+    return _apply_connection_pragmas(
+        sqlite3.connect(DB_PATH, timeout=DB_BUSY_TIMEOUT_SECONDS, check_same_thread=False, cached_statements=256)
+    )
+
+@contextmanager
+def borrow_connection():
+    """Borrow a pooled SQLite connection for the duration of a with-block.
+    
+    Uncommitted work is rolled back before the connection goes back to the
+    pool, matching what closing a connection would have done.
+    """
+    pool = _get_connection_pool()
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _create_pooled_connection()
+    
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+def begin_immediate(conn):
+    """Start a write transaction, taking the write lock up front.
+    
+    Concurrent saves queue here - SQLite's busy handler waits up to
+    DB_BUSY_TIMEOUT_SECONDS for the lock - instead of failing with "database is
+    locked" halfway through; WAL readers are never blocked.
+    """
+    conn.execute('BEGIN IMMEDIATE')
 
 def init_db():
     """Initialize the database with updated schema including user relationships."""
@@ -113,6 +151,12 @@ def init_db():
                       applied_date TEXT,
                       FOREIGN KEY (user_id) REFERENCES users(id))''')
         
+        # Index the per-user job listing (ORDER BY date_added DESC) and status stats
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_jobs_user_date
+                     ON jobs (user_id, date_added DESC)''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_jobs_user_status
+                     ON jobs (user_id, status)''')
+        
         # Create documents table with user relationship
         c.execute('''CREATE TABLE IF NOT EXISTS documents
                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -141,6 +185,15 @@ def init_db():
                       submission_date TEXT,
                       FOREIGN KEY (user_id) REFERENCES users(id))''')
         
+        # Scraped job pages and their AI extraction, keyed on URL
+        c.execute('''CREATE TABLE IF NOT EXISTS scraped_cache
+                     (url TEXT PRIMARY KEY,
+                      content TEXT,
+                      ai_json TEXT,
+                      fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_scraped_cache_fetched_at
+                     ON scraped_cache(fetched_at)''')
+        
         conn.commit()
         # Database initialized silently - no need for user notification
     except Exception as e:
@@ -160,6 +213,78 @@ def get_user_jobs(user_id):
         finally:
             conn.close()
 
+JOBS_OVERVIEW_COLUMNS = 'id, company_name, job_title, job_description, status, date_added'
+
+# Fixed SQL text so pooled connections hit sqlite3's prepared-statement cache
+USER_JOBS_OVERVIEW_SQL = f"SELECT {JOBS_OVERVIEW_COLUMNS} FROM jobs WHERE user_id = ? ORDER BY date_added DESC"
+ALL_JOBS_OVERVIEW_SQL = f"SELECT {JOBS_OVERVIEW_COLUMNS} FROM jobs ORDER BY date_added DESC"
+USER_JOBS_SIGNATURE_SQL = 'SELECT COUNT(*), MAX(date_added) FROM jobs WHERE user_id = ?'
+ALL_JOBS_SIGNATURE_SQL = 'SELECT COUNT(*), MAX(date_added) FROM jobs'
+
+@functools.lru_cache(maxsize=32)
+def _get_jobs_overview_cached(user_id, signature):
+    """Load the jobs overview for a (user_id, table signature) pair; see get_jobs_overview."""
+    with borrow_connection() as conn:
+        if user_id:
+            return pd.read_sql_query(USER_JOBS_OVERVIEW_SQL, conn, params=(user_id,))
+        return pd.read_sql_query(ALL_JOBS_OVERVIEW_SQL, conn)
+
+def get_jobs_overview(user_id=None):
+    """Get the SQLite jobs overview, reusing the last load while the table is unchanged.
+    
+    The cache key includes COUNT(*) and MAX(date_added), so inserts and deletes
+    invalidate it automatically; in-place edits must call clear_jobs_cache().
+    """
+    with borrow_connection() as conn:
+        if user_id:
+            signature = conn.execute(USER_JOBS_SIGNATURE_SQL, (user_id,)).fetchone()
+        else:
+            signature = conn.execute(ALL_JOBS_SIGNATURE_SQL).fetchone()
+    return _get_jobs_overview_cached(user_id, signature).copy()
+
+def clear_jobs_cache():
+    """Drop cached job reads after jobs are edited in place."""
+    _get_jobs_overview_cached.cache_clear()
+
+# Scrapes older than this are fetched again, and pruned when a new scrape is stored.
+# On SQLite this table is the authoritative scrape cache; the in-process URL cache in
+# firecrawl_scraper is only used with Supabase
+SCRAPE_CACHE_MAX_AGE = '-7 days'
+
+def get_cached_scrape(url):
+    """Get (content, ai_analysis) for a URL scraped in the last week, or None.
+    
+    Only available on SQLite; with Supabase every scrape goes to the network.
+    """
+    if use_supabase():
+        return None
+    
+    with borrow_connection() as conn:
+        row = conn.execute(
+            "SELECT content, ai_json FROM scraped_cache WHERE url = ? AND fetched_at > datetime('now', ?)",
+            (url, SCRAPE_CACHE_MAX_AGE)
+        ).fetchone()
+    if row is None:
+        return None
+    return row[0], json.loads(row[1])
+
+def store_cached_scrape(url, content, ai_analysis):
+    """Remember a URL's scraped content and AI extraction for get_cached_scrape, dropping expired rows."""
+    if use_supabase():
+        return
+    
+    with borrow_connection() as conn:
+        conn.execute(
+            "DELETE FROM scraped_cache WHERE fetched_at <= datetime('now', ?)",
+            (SCRAPE_CACHE_MAX_AGE,)
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO scraped_cache (url, content, ai_json, fetched_at) "
+            "VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
+            (url, content, json.dumps(ai_analysis))
+        )
+        conn.commit()
+
 def get_user_documents(user_id):
     """Get all documents for a specific user."""
     if use_supabase():
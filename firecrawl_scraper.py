@@ -20,10 +20,25 @@ import os
 from datetime import datetime
 from typing import Dict, Tuple, Optional
 import json
+import re
+import hashlib
+import time
+import threading
+from collections import OrderedDict
+import requests
+from requests.adapters import HTTPAdapter
 
 # Import existing utilities
 from utils import init_openai_client
 
+# orjson parses the extraction JSON faster when installed; its JSONDecodeError
+# subclasses json.JSONDecodeError, so one except clause covers both
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 try:
     from firecrawl import FirecrawlApp
     FIRECRAWL_AVAILABLE = True
@@ -31,6 +46,68 @@ except ImportError:
     FIRECRAWL_AVAILABLE = False
     print("⚠️ Firecrawl not available. Install with: pip install firecrawl-py")
 
+# Shared HTTP session so Firecrawl calls reuse pooled keep-alive connections
+HTTP_POOL_SIZE = 32
+_http_session = None
+
+# Page render budget Firecrawl gets per scrape, and the (connect, read) timeout on our
+# side of the call - the read timeout leaves headroom over the render budget
+FIRECRAWL_PAGE_TIMEOUT_MS = 30000
+HTTP_TIMEOUT = (5, FIRECRAWL_PAGE_TIMEOUT_MS / 1000 + 15)
+
+# AI extraction results keyed on a hash of the whitespace-normalized page text
+EXTRACTION_CACHE_SIZE = 1024
+_extraction_cache: "OrderedDict[str, Dict]" = OrderedDict()
+_extraction_cache_lock = threading.Lock()
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Successful scrapes keyed on URL, so a repeat submit within the TTL skips the Firecrawl call
+SCRAPE_CACHE_SIZE = 256
+SCRAPE_CACHE_TTL_SECONDS = 24 * 60 * 60
+_scrape_cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+_scrape_cache_lock = threading.Lock()
+
+# Scrapes too short to hold a job listing, or short pages that look like bot walls
+MIN_EXTRACTION_CHARS = 200
+BLOCK_PAGE_MAX_CHARS = 2000
+CAPTCHA_RE = re.compile(r'(cloudflare|captcha|are you human|access denied)', re.I)
+
+
+def get_http_session() -> requests.Session:
+    """Get the module-wide pooled requests session, creating it on first use."""
+    global _http_session
+    if _http_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _http_session = session
+    return _http_session
+
+
+if FIRECRAWL_AVAILABLE:
+    class PooledFirecrawlApp(FirecrawlApp):
+        """FirecrawlApp whose scrape requests go through the shared pooled session.
+        
+        The pinned SDK (firecrawl-py 0.0.16) posts scrapes with the module-level
+        requests.post, opening a new connection each time, so the v0 /scrape call
+        is sent here instead.
+        """
+
+        def scrape_url(self, url, params=None):
+            response = get_http_session().post(
+                f'{self.api_url}/v0/scrape',
+                headers=self._prepare_headers(),
+                json={'url': url, **(params or {})},
+                timeout=HTTP_TIMEOUT
+            )
+            if response.status_code != 200:
+                self._handle_error(response, 'scrape URL')
+            body = response.json()
+            if body.get('success') and 'data' in body:
+                return body['data']
+            raise Exception(f'Failed to scrape URL. Error: {body.get("error")}')
+
 
 class FirecrawlScraper:
     """Cloud-compatible job scraper using Firecrawl API."""
@@ -42,7 +119,7 @@ class FirecrawlScraper:
         
         if FIRECRAWL_AVAILABLE and self.api_key:
             try:
-                self.client = FirecrawlApp(api_key=self.api_key)
+                self.client = PooledFirecrawlApp(api_key=self.api_key)
             except Exception as e:
                 st.error(f"Failed to initialize Firecrawl client: {str(e)}")
                 self.client = None
@@ -101,21 +178,16 @@ class FirecrawlScraper:
             # Use simple scraping parameters
             scrape_params = {
                 'formats': ['markdown'],
-                'onlyMainContent': True
+                'onlyMainContent': True,
+                'timeout': FIRECRAWL_PAGE_TIMEOUT_MS
             }
             
             # Perform the scrape
             result = self.client.scrape_url(url, scrape_params)
             
-            # Extract content from Firecrawl response
-            if result and hasattr(result, 'get'):
-                content = result.get('markdown', '') or result.get('content', '') or result.get('data', {}).get('markdown', '')
-            elif result and hasattr(result, 'markdown'):
-                content = result.markdown
-            elif result and hasattr(result, 'content'):
-                content = result.content
-            else:
-                content = str(result) if result else ""
+            # Extract content from Firecrawl response (dict or response object)
+            data = result if isinstance(result, dict) else (getattr(result, '__dict__', None) or {})
+            content = data.get('markdown') or data.get('content') or (data.get('data') or {}).get('markdown') or ''
             
             if content and content.strip():
                 return content, None
@@ -126,16 +198,24 @@ class FirecrawlScraper:
             return None, f"Error during Firecrawl scraping: {str(e)}"
     
     
-    def scrape_job_url(self, url: str) -> Dict:
+    def scrape_job_url(self, url: str, use_cache: bool = True) -> Dict:
         """
         Simple job scraping: just scrape URL and return content.
         
         Args:
             url (str): Job listing URL
+            use_cache (bool): Reuse a recent successful scrape of the same URL
             
         Returns:
             Dict: Scraped content or error details
         """
+        # A recent successful scrape of the same URL is reused as-is
+        with _scrape_cache_lock:
+            cached = _scrape_cache.get(url) if use_cache else None
+            if cached is not None and time.monotonic() - cached[0] < SCRAPE_CACHE_TTL_SECONDS:
+                _scrape_cache.move_to_end(url)
+                return {**cached[1], "data": dict(cached[1]["data"])}
+        
         # Scrape the URL
         content, error = self.scrape_url(url)
         
@@ -147,15 +227,23 @@ class FirecrawlScraper:
             }
         
         # Return the scraped content - let the UI handle AI processing
-        return {
+        result = {
             "success": True,
             "data": {
                 "scraped_content": content,
-                "scraped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "scraped_at": datetime.now().isoformat(sep=' ', timespec='seconds'),
                 "source_url": url
             },
             "source": "firecrawl_scraping"
         }
+        
+        with _scrape_cache_lock:
+            _scrape_cache[url] = (time.monotonic(), result)
+            _scrape_cache.move_to_end(url)
+            if len(_scrape_cache) > SCRAPE_CACHE_SIZE:
+                _scrape_cache.popitem(last=False)
+        
+        return {**result, "data": dict(result["data"])}
 
 
 def validate_and_prepare_text(text: str, max_tokens: int = 12000) -> Tuple[str, Dict]:
@@ -191,26 +279,91 @@ def validate_and_prepare_text(text: str, max_tokens: int = 12000) -> Tuple[str,
     return processed_text, metadata
 
 
-def scraper_openai_agent(text: str) -> str:
+def _read_json_stream(stream) -> str:
     """
-    Extract job information from text using OpenAI API with proper token management.
+    Consume a streamed chat completion until the first JSON object is balanced.
+    
+    Braces are counted outside of string literals only, so a "{" or "}" inside
+    the job description does not end the read early. Once the top-level object
+    closes the stream is closed, so trailing output is never generated, and only
+    the object itself is returned.
     
     Args:
-        text (str): Raw text content to analyze
+        stream: Iterable of chat completion chunks (``stream=True`` response)
         
     Returns:
-        str: JSON string with extracted job information or error details
+        str: The JSON object text, or everything received if it never closed
     """
-    # Initialize OpenAI client
-    client = init_openai_client()
-    if client is None:
-        return json.dumps({"error": "OpenAI client initialization failed. Please check your API key configuration."})
+    buf = []
+    depth = 0
+    start = None
+    consumed = 0
+    in_string = False
+    escaped = False
+    
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            piece = chunk.choices[0].delta.content
+            if not piece:
+                continue
+            buf.append(piece)
+            
+            for i, ch in enumerate(piece):
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif ch == '\\':
+                        escaped = True
+                    elif ch == '"':
+                        in_string = False
+                elif ch == '"':
+                    in_string = start is not None
+                elif ch == '{':
+                    if start is None:
+                        start = consumed + i
+                    depth += 1
+                elif ch == '}' and start is not None:
+                    depth -= 1
+                    if depth == 0:
+                        # Drop any code fences or commentary around the object
+                        return ''.join(buf)[start:consumed + i + 1]
+            consumed += len(piece)
+    finally:
+        close = getattr(stream, 'close', None)
+        if close:
+            close()
+    
+    return ''.join(buf)
+
+
+def content_hash(text: str) -> str:
+    """Hash page text after collapsing whitespace so trivially different scrapes share a key."""
+    return hashlib.sha1(_WHITESPACE_RE.sub(' ', text).strip().encode()).hexdigest()
 
-    # Validate and prepare text
-    processed_text, metadata = validate_and_prepare_text(text, max_tokens=12000)
 
-    # Define the system message (optimized for token efficiency)
-    system_message = """
+def _get_cached_extraction(key: str) -> Optional[Dict]:
+    """Return a copy of a cached extraction result, marking it most recently used."""
+    with _extraction_cache_lock:
+        result = _extraction_cache.get(key)
+        if result is not None:
+            _extraction_cache.move_to_end(key)
+            return dict(result)
+        return None
+
+
+def _store_extraction(key: str, result: Dict):
+    """Cache an extraction result, evicting the least recently used entry when full."""
+    with _extraction_cache_lock:
+        _extraction_cache[key] = dict(result)
+        _extraction_cache.move_to_end(key)
+        if len(_extraction_cache) > EXTRACTION_CACHE_SIZE:
+            _extraction_cache.popitem(last=False)
+
+
+# Extraction prompt (optimized for token efficiency), built once at import
+EXTRACTION_SYSTEM_MESSAGE = """
     You are an intelligent extraction agent. Extract detailed job information from the provided text:
 
     REQUIRED FIELDS:
@@ -233,46 +386,92 @@ def scraper_openai_agent(text: str) -> str:
 
     Return ONLY a valid JSON dictionary with these exact keys: "Company Name", "Job Title", "Job Description", "Job Location", "Job Salary".
     """
-    
-    # Define the user message with the content
-    truncation_note = " [NOTE: Input text was truncated due to length limits]" if metadata["truncated"] else ""
-    user_message = f"""
+
+# The user message wraps the page text; only the text itself varies per call
+USER_MESSAGE_PREFIX = """
     Please extract the job information from this text. Ensure the Job Description field contains the COMPLETE, UNTRUNCATED description with all details preserved:
 
-    {processed_text}{truncation_note}
     """
+USER_MESSAGE_SUFFIX = """
+    """
+
+
+def scraper_openai_agent(text: str) -> Dict:
+    """
+    Extract job information from text using OpenAI API with proper token management.
+    
+    Args:
+        text (str): Raw text content to analyze
+        
+    Returns:
+        Dict: Extracted job information or error details
+    """
+    # Don't spend an API round-trip on empty pages or captcha/block pages
+    stripped = text.strip() if text else ''
+    if len(stripped) < MIN_EXTRACTION_CHARS:
+        return {"error": "Insufficient content for extraction"}
+    if len(stripped) < BLOCK_PAGE_MAX_CHARS and CAPTCHA_RE.search(stripped):
+        return {"error": "Page appears to be a captcha or access-denied page"}
+    
+    # Identical page content has already been extracted - skip the API call
+    cache_key = content_hash(text)
+    cached = _get_cached_extraction(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Initialize OpenAI client
+    client = init_openai_client()
+    if client is None:
+        return {"error": "OpenAI client initialization failed. Please check your API key configuration."}
+
+    # Validate and prepare text
+    processed_text, metadata = validate_and_prepare_text(text, max_tokens=12000)
+    
+    # Define the user message with the content
+    truncation_note = " [NOTE: Input text was truncated due to length limits]" if metadata["truncated"] else ""
+    user_message = USER_MESSAGE_PREFIX + processed_text + truncation_note + USER_MESSAGE_SUFFIX
     
     try:
-        # Generate AI response using OpenAI API with proper token limits
+        # Stream the response so we can stop as soon as the JSON object is complete
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo-16k",  # Use 16k model for larger context
+            model="gpt-4o-mini",  # 128k context and supports JSON mode
             messages=[
-                {"role": "system", "content": system_message},
+                {"role": "system", "content": EXTRACTION_SYSTEM_MESSAGE},
                 {"role": "user", "content": user_message}
             ],
             max_tokens=4096,  # Allow for longer responses
-            temperature=0.1   # Low temperature for consistent, factual extraction
+            temperature=0.1,  # Low temperature for consistent, factual extraction
+            response_format={"type": "json_object"},  # Guarantees a parseable JSON object
+            stream=True
         )
         
-        return response.choices[0].message.content
+        raw_result = _read_json_stream(response)
+        try:
+            result = _json_loads(raw_result)
+        except json.JSONDecodeError:
+            return {"Analysis": raw_result}
+        
+        _store_extraction(cache_key, result)
+        return result
         
     except Exception as e:
-        return json.dumps({"error": f"OpenAI API call failed: {str(e)}"})
+        return {"error": f"OpenAI API call failed: {str(e)}"}
 
 
 # Convenience functions for backward compatibility
-def scrape_job_with_firecrawl(url: str) -> Dict:
+def scrape_job_with_firecrawl(url: str, use_cache: bool = True) -> Dict:
     """
     Convenience function to scrape a job URL with Firecrawl.
     
     Args:
         url (str): Job listing URL
+        use_cache (bool): Reuse a recent successful scrape of the same URL
         
     Returns:
         Dict: Job information or error details
     """
     scraper = FirecrawlScraper()
-    return scraper.scrape_job_url(url)
+    return scraper.scrape_job_url(url, use_cache=use_cache)
 
 
 def is_firecrawl_available() -> bool:
@@ -1,165 +1,204 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from utils import get_db_connection, init_db, ensure_directories
+import json
+import sqlite3
+from utils import init_db, ensure_directories
+from database_utils import (
+    begin_immediate, borrow_connection, clear_jobs_cache, use_supabase,
+    get_cached_scrape, store_cached_scrape
+)
+try:
+    from supabase_utils import get_supabase_client
+except ImportError:
+    get_supabase_client = None  # use_supabase() is False without the supabase package
 from streamlit_shadcn_ui import tabs
-from selenium_scraper import open_webpage, get_longest_text_content, save_job_to_database
-from firecrawl_scraper import scrape_job_with_firecrawl, is_firecrawl_available, scraper_openai_agent
 
-import json
 import time
 
 # Note: Database initialization is handled by main app.py to prevent cloud filesystem issues
 # ensure_directories() also moved to main app initialization
 
-# Initialize session state
-if 'jobs_data' not in st.session_state:
-    st.session_state.jobs_data = pd.DataFrame(columns=[
-        'company_name', 'job_title', 'job_description', 'application_url',
-        'status', 'sentiment', 'notes', 'date_added', 'location', 'salary', 'applied_date'
-    ])
+# Columns the Jobs Database editor can change, in SQL parameter order
+JOB_EDITABLE_COLUMNS = [
+    'company_name', 'job_title', 'job_description', 'application_url',
+    'status', 'sentiment', 'notes', 'location', 'salary', 'applied_date'
+]
+
+# Columns shown in the Jobs Database editor, in display order
+JOB_TABLE_COLUMNS = ['id'] + JOB_EDITABLE_COLUMNS + ['date_added']
+
+JOB_PAGE_SQL = f"SELECT {', '.join(JOB_TABLE_COLUMNS)} FROM jobs ORDER BY date_added DESC LIMIT ? OFFSET ?"
+
+# One statement for every edited row: rows with an id update in place, rows with
+# a NULL id are inserted; date_added and user_id are only set on insert
+JOB_UPSERT_SQL = (
+    f"INSERT INTO jobs (id, {', '.join(JOB_EDITABLE_COLUMNS)}, date_added, user_id) "
+    f"VALUES ({', '.join(['?'] * (len(JOB_EDITABLE_COLUMNS) + 3))}) "
+    f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{col} = excluded.{col}' for col in JOB_EDITABLE_COLUMNS)}"
+)
+
+# Rows shown per Jobs Database page; only the visible page is read and edited
+JOBS_PAGE_SIZE_OPTIONS = [50, 100, 250]
 
-# Add custom CSS for the container
-st.markdown("""
-    <style>
-    .job-submission-container {
-        border: 1px solid #e2e8f0;
-        border-radius: 0.5rem;
-        padding: 1.5rem;
-        background-color: white;
-        box-shadow: 0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1);
-    }
-    </style>
-""", unsafe_allow_html=True)
+# Format of the date_added column
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Characters of a scraped job description echoed back in the Firecrawl results
+DESCRIPTION_PREVIEW_CHARS = 2000
+
+# IDs per Supabase delete().in_() request, keeping the filter well inside URL length limits
+SUPABASE_DELETE_BATCH_SIZE = 500
+
+# Fixed statement text whatever the number of IDs, so sqlite's statement cache always hits
+# and large deletes never run into the bound-parameter limit
+JOB_DELETE_SQL = 'DELETE FROM jobs WHERE id IN (SELECT value FROM json_each(?))'
+# For sqlite builds without the JSON1 functions (built in from 3.38)
+JOB_DELETE_ONE_SQL = 'DELETE FROM jobs WHERE id = ?'
+
+JOB_INSERT_SQL = (
+    'INSERT INTO jobs (user_id, company_name, job_title, job_description, application_url, '
+    'status, sentiment, notes, date_added, location, salary, applied_date) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
+def _changed_job_rows(jobs_df, original_df):
+    """Return the rows of jobs_df that are new or differ from original_df in an editable column."""
+    has_id = jobs_df['id'].notna()
+    after = jobs_df.loc[has_id, JOB_EDITABLE_COLUMNS].to_numpy(dtype=object)
+    before = original_df.set_index('id')[JOB_EDITABLE_COLUMNS] \
+        .reindex(jobs_df.loc[has_id, 'id']).to_numpy(dtype=object)
+    
+    # Treat NaN/None on both sides as equal, otherwise compare values directly
+    differs = ~((after == before) | (pd.isna(after) & pd.isna(before)))
+    
+    changed = ~has_id
+    changed[has_id] = differs.any(axis=1)
+    return jobs_df[changed]
 
-def save_jobs_to_database(jobs_df):
-    """Save changes from the DataFrame back to the database using unified database system."""
-    from database_utils import use_supabase
+def save_jobs_to_database(jobs_df, original_df):
+    """Save changes from the DataFrame back to the database using unified database system.
+    
+    original_df is the table as loaded into the editor: rows missing from jobs_df
+    are deleted and only new or changed rows are written.
+    """
+    # Get the IDs in the edited DataFrame
+    edited_ids = set(jobs_df['id'].dropna())
+    # Stamp for every row this save inserts
+    date_added = datetime.now().strftime(TIMESTAMP_FORMAT)
+    
+    # Deletions are diffed against what was loaded - no need to read the IDs back
+    delete_ids = [int(job_id) for job_id in set(original_df['id'].dropna()) - edited_ids]
+    
+    # Skip rows the user never touched
+    jobs_df = _changed_job_rows(jobs_df, original_df)
     
     if use_supabase():
-        from supabase_utils import get_supabase_client
         try:
             supabase = get_supabase_client()
             
-            # Get current job IDs
-            current_result = supabase.table('jobs').select('id').execute()
-            current_ids = set(row['id'] for row in current_result.data)
+            # Normalize once up front: JSON has no NaN, so missing values go out as null
+            jobs_df = jobs_df.astype(object).where(jobs_df.notna(), None)
             
-            # Get edited job IDs
-            edited_ids = set(jobs_df['id'].dropna())
+            # Delete removed jobs in as few requests as the URL length allows
+            for start in range(0, len(delete_ids), SUPABASE_DELETE_BATCH_SIZE):
+                batch = delete_ids[start:start + SUPABASE_DELETE_BATCH_SIZE]
+                supabase.table('jobs').delete().in_('id', batch).execute()
             
-            # Delete removed jobs
-            ids_to_delete = current_ids - edited_ids
-            if ids_to_delete:
-                for job_id in ids_to_delete:
-                    supabase.table('jobs').delete().eq('id', job_id).execute()
+            # Update changed jobs with one bulk upsert (only the editable columns change)
+            has_id = jobs_df['id'].notna()
+            if has_id.any():
+                records = jobs_df.loc[has_id, ['id'] + JOB_EDITABLE_COLUMNS].to_dict('records')
+                for record in records:
+                    record['id'] = int(record['id'])
+                supabase.table('jobs').upsert(records, on_conflict='id').execute()
             
-            # Update or insert jobs
-            for _, row in jobs_df.iterrows():
-                job_data = {
-                    'company_name': row['company_name'],
-                    'job_title': row['job_title'],
-                    'job_description': row['job_description'],
-                    'application_url': row['application_url'],
-                    'status': row['status'],
-                    'sentiment': row['sentiment'],
-                    'notes': row['notes'],
-                    'location': row['location'],
-                    'salary': row['salary'],
-                    'applied_date': row['applied_date']
-                }
-                
-                if pd.notna(row['id']):
-                    # Update existing job
-                    supabase.table('jobs').update(job_data).eq('id', row['id']).execute()
-                else:
-                    # Insert new job
-                    job_data['date_added'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    supabase.table('jobs').insert(job_data).execute()
+            # Insert new jobs with one bulk insert
+            if not has_id.all():
+                new_records = jobs_df.loc[~has_id, JOB_EDITABLE_COLUMNS].assign(date_added=date_added).to_dict('records')
+                supabase.table('jobs').insert(new_records).execute()
             
             return True, "Changes saved successfully!"
         except Exception as e:
             return False, f"Error saving changes: {str(e)}"
     else:
         # SQLite fallback
-        conn = get_db_connection()
-        try:
-            # First, get the current data to compare
-            current_data = pd.read_sql_query("SELECT id FROM jobs", conn)
-            current_ids = set(current_data['id'])
-            
-            # Get the IDs in the edited DataFrame
-            edited_ids = set(jobs_df['id'].dropna())
+        with borrow_connection() as conn:
+            try:
+                # One write transaction for the whole save: a single commit/fsync,
+                # and the write lock is taken up front rather than mid-save
+                begin_immediate(conn)
             
-            # Find IDs to delete (in current but not in edited)
-            ids_to_delete = current_ids - edited_ids
-            
-            # Delete removed rows
-            if ids_to_delete:
-                placeholders = ','.join('?' * len(ids_to_delete))
-                conn.execute(f'DELETE FROM jobs WHERE id IN ({placeholders})', tuple(ids_to_delete))
+                # Delete rows removed in the editor; nothing to do when only cells were edited
+                if delete_ids:
+                    try:
+                        conn.execute(JOB_DELETE_SQL, (json.dumps(delete_ids),))
+                    except sqlite3.OperationalError:
+                        conn.executemany(JOB_DELETE_ONE_SQL, [(job_id,) for job_id in delete_ids])
             
-            # Update or insert remaining rows
-            for _, row in jobs_df.iterrows():
-                if pd.notna(row['id']):
-                    # Update existing row
-                    conn.execute('''UPDATE jobs 
-                                  SET company_name = ?, 
-                                      job_title = ?, 
-                                      job_description = ?, 
-                                      application_url = ?, 
-                                      status = ?, 
-                                      sentiment = ?, 
-                                      notes = ?,
-                                      location = ?,
-                                      salary = ?,
-                                      applied_date = ?
-                                  WHERE id = ?''',
-                               (row['company_name'], row['job_title'], 
-                                row['job_description'], row['application_url'],
-                                row['status'], row['sentiment'], row['notes'],
-                                row['location'], row['salary'], row['applied_date'],
-                                row['id']))
-                else:
-                    # Insert new row
-                    conn.execute('''INSERT INTO jobs 
-                                  (company_name, job_title, job_description, 
-                                   application_url, status, sentiment, notes, date_added,
-                                   location, salary, applied_date)
-                                  VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                               (row['company_name'], row['job_title'], 
-                                row['job_description'], row['application_url'],
-                                row['status'], row['sentiment'], row['notes'],
-                                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                row['location'], row['salary'], row['applied_date']))
+                # Upsert the new and changed rows in one prepared batch
+                user_id = st.session_state.get('user_id')
+                # to_numpy(dtype=object) yields Python scalars; a NaN id binds as NULL
+                # (a new row) and float ids like 3.0 resolve to the integer key
+                values = jobs_df[['id'] + JOB_EDITABLE_COLUMNS].to_numpy(dtype=object)
+                conn.executemany(JOB_UPSERT_SQL, (tuple(row) + (date_added, user_id) for row in values))
             
-            conn.commit()
-            return True, "Changes saved successfully!"
-        except Exception as e:
-            conn.rollback()
-            return False, f"Error saving changes: {str(e)}"
-        finally:
-            conn.close()
+                conn.commit()
+                clear_jobs_cache()
+                return True, "Changes saved successfully!"
+            except Exception as e:
+                conn.rollback()
+                return False, f"Error saving changes: {str(e)}"
+
+def _jobs_table_version():
+    """Cheap SQLite change marker so rows added or removed by other sessions refresh the cache."""
+    if use_supabase():
+        return None  # An extra HTTP round trip per rerun would cost more than the TTL saves
+    
+    with borrow_connection() as conn:
+        return conn.execute('SELECT COUNT(*), MAX(id) FROM jobs').fetchone()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_jobs_table(table_version=None, page=0, page_size=JOBS_PAGE_SIZE_OPTIONS[0]):
+    """Load one page of the Jobs Database table, returning (page_df, total_jobs).
+    
+    Writes from this app clear the cache through _invalidate_jobs_table, and
+    table_version tracks SQLite row changes made elsewhere.
+    """
+    offset = page * page_size
+    
+    if use_supabase():
+        supabase = get_supabase_client()
+        result = supabase.table('jobs').select(','.join(JOB_TABLE_COLUMNS), count='exact').order('date_added', desc=True) \
+            .range(offset, offset + page_size - 1).execute()
+        jobs_df = pd.DataFrame(result.data) if result.data else pd.DataFrame()
+        return jobs_df, result.count or 0
+    
+    with borrow_connection() as conn:
+        total_jobs = conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+        jobs_df = pd.read_sql_query(JOB_PAGE_SQL, conn, params=(page_size, offset))
+        return jobs_df, total_jobs
+
+def _invalidate_jobs_table():
+    """Drop every cached Jobs Database page after a write, for all sessions."""
+    _load_jobs_table.clear()
 
 def show_jobs_portal():
     """Show the Jobs Portal with shadcn tabs using unified database system."""
-    from database_utils import use_supabase
-    
     # Create shadcn tabs with default tab
     selected_tab = tabs(["Jobs Database", "Jobs Submissions", "Firecrawl Job Scraper"], default_value="Jobs Database")
     
     if selected_tab == "Jobs Database":
         try:
-            if use_supabase():
-                from supabase_utils import get_supabase_client
-                supabase = get_supabase_client()
-                result = supabase.table('jobs').select('*').order('date_added', desc=True).execute()
-                jobs_df = pd.DataFrame(result.data) if result.data else pd.DataFrame()
-            else:
-                conn = get_db_connection()
-                jobs_df = pd.read_sql_query("SELECT * FROM jobs ORDER BY date_added DESC", conn)
-                conn.close()
-                
+            table_version = _jobs_table_version()
+            page = st.session_state.get('jobs_page', 1)
+            page_size = st.session_state.get('jobs_page_size', JOBS_PAGE_SIZE_OPTIONS[0])
+            jobs_df, total_jobs = _load_jobs_table(table_version, page - 1, page_size)
+            page_count = max(1, -(-total_jobs // page_size))
+            if page > page_count:
+                # Jobs were removed or the page size grew - show the last page instead
+                st.session_state.jobs_page = page = page_count
+                jobs_df, total_jobs = _load_jobs_table(table_version, page - 1, page_size)
             st.session_state.df = jobs_df
             if not jobs_df.empty:
                 # Create a form for the data editor
@@ -173,12 +212,25 @@ def show_jobs_portal():
                     
                     # Add save button
                     if st.form_submit_button("Save Changes"):
-                        success, message = save_jobs_to_database(edited_df)
-                        if success:
-                            st.success(message)
-                            st.rerun()  # Refresh to show updated data
+                        # Nothing edited - skip the database round trip entirely
+                        if edited_df.equals(jobs_df):
+                            st.info("No changes to save.")
                         else:
-                            st.error(message)
+                            success, message = save_jobs_to_database(edited_df, jobs_df)
+                            if success:
+                                _invalidate_jobs_table()
+                                st.success(message)
+                                st.rerun()  # Refresh to show updated data
+                            else:
+                                st.error(message)
+                
+                if total_jobs > JOBS_PAGE_SIZE_OPTIONS[0]:
+                    page_col, size_col = st.columns(2)
+                    with page_col:
+                        st.number_input(f"Page (of {page_count}, {total_jobs} jobs)", min_value=1,
+                                        max_value=page_count, key='jobs_page')
+                    with size_col:
+                        st.selectbox("Rows per page", JOBS_PAGE_SIZE_OPTIONS, key='jobs_page_size')
             else:
                 st.info("No jobs added yet. Add your first job in the Job Portal!")
         except Exception as e:
@@ -209,11 +261,10 @@ def show_jobs_portal():
             submitted = st.form_submit_button("Submit")
             
             if submitted:
-                from database_utils import use_supabase
                 user_id = st.session_state.get('user_id')
+                date_added = datetime.now().strftime(TIMESTAMP_FORMAT)
                 
                 if use_supabase():
-                    from supabase_utils import get_supabase_client
                     try:
                         supabase = get_supabase_client()
                         job_data = {
@@ -225,36 +276,37 @@ def show_jobs_portal():
                             'status': status,
                             'sentiment': sentiment,
                             'notes': notes,
-                            'date_added': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                            'date_added': date_added,
                             'location': location,
                             'salary': salary,
                             'applied_date': applied_date.strftime("%Y-%m-%d") if applied_date else None
                         }
                         supabase.table('jobs').insert(job_data).execute()
+                        _invalidate_jobs_table()
                         st.success("Job added successfully!")
                     except Exception as e:
                         st.error(f"Error adding job: {str(e)}")
                 else:
                     # SQLite fallback
-                    conn = get_db_connection()
-                    c = conn.cursor()
-                    c.execute('''INSERT INTO jobs 
-                                (user_id, company_name, job_title, job_description, application_url,
-                                 status, sentiment, notes, date_added, location, salary, applied_date)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                             (user_id, company_name, job_title, job_description, application_url,
-                              status, sentiment, notes, datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                              location, salary, applied_date.strftime("%Y-%m-%d") if applied_date else None))
-                    conn.commit()
-                    conn.close()
+                    with borrow_connection() as conn:
+                        c = conn.cursor()
+                        c.execute(JOB_INSERT_SQL,
+                                 (user_id, company_name, job_title, job_description, application_url,
+                                  status, sentiment, notes, date_added,
+                                  location, salary, applied_date.strftime("%Y-%m-%d") if applied_date else None))
+                        conn.commit()
+                    _invalidate_jobs_table()
                     st.success("Job added successfully!")
     
     elif selected_tab == "Firecrawl Job Scraper":
+        # Imported here so the other tabs don't pay for the Firecrawl/OpenAI SDK imports
+        from firecrawl_scraper import scrape_job_with_firecrawl, is_firecrawl_available, scraper_openai_agent
+        
         st.info("🔥 **Firecrawl-Only Scraper** - Test the cloud-compatible Firecrawl API directly")
         
         # Initialize session state for Firecrawl scraper (separate from URL Job Loader)
-        if 'firecrawl_job_description' not in st.session_state:
-            st.session_state.firecrawl_job_description = None
+        if 'firecrawl_content_chars' not in st.session_state:
+            st.session_state.firecrawl_content_chars = 0
         if 'firecrawl_job_metadata' not in st.session_state:
             st.session_state.firecrawl_job_metadata = {}
         if 'firecrawl_ai_analysis' not in st.session_state:
@@ -284,6 +336,7 @@ def show_jobs_portal():
                 "Application Status", 
                 ["Not Applied", "Applied", "Interviewing", "Offered", "Rejected", "Interviewed - Rejected"]
             )
+            force_rescrape = st.checkbox("Force re-scrape", help="Ignore the saved result for this URL and scrape it again")
             
             # Submit button
             get_details = st.form_submit_button("🔥 Scrape & Parse with AI")
@@ -303,8 +356,19 @@ def show_jobs_portal():
                     import time as time_module
                     start_time = time_module.time()
                     
-                    # Use Firecrawl exclusively (no fallbacks)
-                    result = scrape_job_with_firecrawl(job_url)
+                    # A scrape of this URL from the last week (content and AI extraction)
+                    # is reused unless the user forces a fresh one
+                    cached_scrape = None if force_rescrape else get_cached_scrape(job_url)
+                    if cached_scrape:
+                        result = {
+                            "success": True,
+                            "data": {"scraped_content": cached_scrape[0], "source_url": job_url},
+                            "source": "scrape_cache"
+                        }
+                    else:
+                        # Use Firecrawl exclusively (no fallbacks). The table above is the
+                        # scrape cache on SQLite; the in-process one only serves Supabase
+                        result = scrape_job_with_firecrawl(job_url, use_cache=use_supabase() and not force_rescrape)
                     
                     end_time = time_module.time()
                     scrape_time = end_time - start_time
@@ -316,35 +380,32 @@ def show_jobs_portal():
                         scraped_content = data.get("scraped_content", "")
                         
                         if scraped_content and scraped_content.strip():
-                            # Store in session state for AI parsing
-                            st.session_state.firecrawl_job_description = scraped_content
+                            # Only the size is needed later (scraping summary) - keep the
+                            # raw page text out of session state
+                            st.session_state.firecrawl_content_chars = len(scraped_content)
 
                             # Automatically parse with AI
                             with st.spinner("🤖 Parsing with AI..."):
-                                ai_analysis = scraper_openai_agent(scraped_content)
+                                if cached_scrape:
+                                    ai_analysis = cached_scrape[1]
+                                else:
+                                    ai_analysis = scraper_openai_agent(scraped_content)
+                                    if 'error' not in ai_analysis:
+                                        store_cached_scrape(job_url, scraped_content, ai_analysis)
 
                                 # Display AI analysis
                                 st.subheader("🤖 AI Analysis")
 
-                                # Parse AI response
-                                if isinstance(ai_analysis, str):
-                                    try:
-                                        analysis_dict = json.loads(ai_analysis)
-                                    except:
-                                        analysis_dict = {"Analysis": ai_analysis}
-                                else:
-                                    analysis_dict = ai_analysis
-
                                 # Map to our standard format
                                 job_details = {
-                                    'company_name': analysis_dict.get('Company Name', ''),
-                                    'job_title': analysis_dict.get('Job Title', ''),
-                                    'job_description': analysis_dict.get('Job Description', ''),
+                                    'company_name': ai_analysis.get('Company Name', ''),
+                                    'job_title': ai_analysis.get('Job Title', ''),
+                                    'job_description': ai_analysis.get('Job Description', ''),
                                     'application_url': st.session_state.firecrawl_job_metadata['job_url'],
                                     'status': 'Not Applied',
                                     'sentiment': 'Neutral',
-                                    'location': analysis_dict.get('Job Location', 'Not Listed'),
-                                    'salary': analysis_dict.get('Job Salary', 'Not Listed'),
+                                    'location': ai_analysis.get('Job Location', 'Not Listed'),
+                                    'salary': ai_analysis.get('Job Salary', 'Not Listed'),
                                     'applied_date': '',
                                     'notes': f'Scraped with Firecrawl API in {st.session_state.firecrawl_scrape_time:.2f}s'
                                 }
@@ -352,8 +413,14 @@ def show_jobs_portal():
                                 # Store in session state
                                 st.session_state.firecrawl_ai_analysis = job_details
 
-                                # Display the standardized format
-                                st.json(job_details)
+                                # Display the standardized format, with only the start of a
+                                # long description - the full text is saved and shown in Jobs Database.
+                                # JSON mode can return a null description on non-job pages
+                                description = job_details['job_description'] or ''
+                                if len(description) > DESCRIPTION_PREVIEW_CHARS:
+                                    description = (f"{description[:DESCRIPTION_PREVIEW_CHARS]}… "
+                                                   f"[{len(job_details['job_description']):,} characters]")
+                                st.json({**job_details, 'job_description': description})
                                 st.success("✅ Scraping and AI parsing completed!")
                         else:
                             st.error("❌ Could not extract content from the webpage using Firecrawl")
@@ -362,7 +429,7 @@ def show_jobs_portal():
                             # Show debug information
                             if data:
                                 st.write("**Debug - Raw Response Data:**")
-                                st.json(data)
+                                st.json(data, expanded=False)
                     else:
                         error = result.get("error", "Unknown error")
                         st.error(f"❌ Firecrawl scraping failed: {error}")
@@ -375,7 +442,7 @@ def show_jobs_portal():
                         
                         # Show debug information
                         st.write("**Debug - Full Response:**")
-                        st.json(result)
+                        st.json(result, expanded=False)
 
         # Show save form if we have AI analysis
         if st.session_state.firecrawl_ai_analysis:
@@ -394,9 +461,9 @@ def show_jobs_portal():
                 applied_date = st.date_input("Date Applied", value=None)
                 
                 if st.form_submit_button("💾 Save to Database", use_container_width=True):
-                    from database_utils import use_supabase
                     try:
                         user_id = st.session_state.get('user_id')
+                        date_added = datetime.now().strftime(TIMESTAMP_FORMAT)
 
                         # Update notes before saving
                         st.session_state.firecrawl_ai_analysis['notes'] = notes
@@ -406,7 +473,6 @@ def show_jobs_portal():
                             st.session_state.firecrawl_ai_analysis['status'] = 'Applied'
 
                         if use_supabase():
-                            from supabase_utils import get_supabase_client
                             supabase = get_supabase_client()
                             job_data = {
                                 'user_id': user_id,
@@ -417,7 +483,7 @@ def show_jobs_portal():
                                 'status': st.session_state.firecrawl_ai_analysis['status'],
                                 'sentiment': st.session_state.firecrawl_ai_analysis['sentiment'],
                                 'notes': notes,
-                                'date_added': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                'date_added': date_added,
                                 'location': st.session_state.firecrawl_ai_analysis['location'],
                                 'salary': st.session_state.firecrawl_ai_analysis['salary'],
                                 'applied_date': applied_date.strftime("%Y-%m-%d") if applied_date else None
@@ -425,35 +491,33 @@ def show_jobs_portal():
                             supabase.table('jobs').insert(job_data).execute()
                         else:
                             # SQLite fallback
-                            conn = get_db_connection()
-                            c = conn.cursor()
-                            c.execute('''INSERT INTO jobs 
-                                        (user_id, company_name, job_title, job_description, application_url,
-                                         status, sentiment, notes, date_added, location, salary, applied_date)
-                                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                                     (user_id,
-                                      st.session_state.firecrawl_ai_analysis['company_name'],
-                                      st.session_state.firecrawl_ai_analysis['job_title'],
-                                      st.session_state.firecrawl_ai_analysis['job_description'],
-                                      st.session_state.firecrawl_ai_analysis['application_url'],
-                                      st.session_state.firecrawl_ai_analysis['status'],
-                                      st.session_state.firecrawl_ai_analysis['sentiment'],
-                                      notes,
-                                      datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                      st.session_state.firecrawl_ai_analysis['location'],
-                                      st.session_state.firecrawl_ai_analysis['salary'],
-                                      applied_date.strftime("%Y-%m-%d") if applied_date else None))
-                            conn.commit()
-                            conn.close()
+                            with borrow_connection() as conn:
+                                c = conn.cursor()
+                                c.execute(JOB_INSERT_SQL,
+                                         (user_id,
+                                          st.session_state.firecrawl_ai_analysis['company_name'],
+                                          st.session_state.firecrawl_ai_analysis['job_title'],
+                                          st.session_state.firecrawl_ai_analysis['job_description'],
+                                          st.session_state.firecrawl_ai_analysis['application_url'],
+                                          st.session_state.firecrawl_ai_analysis['status'],
+                                          st.session_state.firecrawl_ai_analysis['sentiment'],
+                                          notes,
+                                          date_added,
+                                          st.session_state.firecrawl_ai_analysis['location'],
+                                          st.session_state.firecrawl_ai_analysis['salary'],
+                                          applied_date.strftime("%Y-%m-%d") if applied_date else None))
+                                conn.commit()
+                        
+                        _invalidate_jobs_table()
                         
                         # Show success message
                         st.success("🎉 Job details saved successfully via Firecrawl!")
                         
                         # Show performance summary
-                        st.info(f"📊 **Scraping Summary:** {st.session_state.firecrawl_scrape_time:.2f}s scrape time, {len(st.session_state.firecrawl_job_description):,} characters extracted")
+                        st.info(f"📊 **Scraping Summary:** {st.session_state.firecrawl_scrape_time:.2f}s scrape time, {st.session_state.firecrawl_content_chars:,} characters extracted")
                         
                         # Clear session state after successful save
-                        st.session_state.firecrawl_job_description = None
+                        st.session_state.firecrawl_content_chars = 0
                         st.session_state.firecrawl_job_metadata = {}
                         st.session_state.firecrawl_ai_analysis = None
                         st.session_state.firecrawl_scrape_time = None
@@ -1,10 +1,13 @@
 import streamlit as st
 import sqlite3
 import hashlib
+import hmac
+import base64
 from datetime import datetime
 import os
 from streamlit_option_menu import option_menu
-from utils import get_menu_style, get_db_connection
+from utils import get_menu_style
+from database_utils import begin_immediate, borrow_connection
 from user_portal import show_user_portal
 from jobs_portal import show_jobs_portal
 from dashboard_utils import show_dashboard
@@ -18,57 +21,91 @@ def init_auth_db():
     from database_utils import init_db
     return init_db()
 
-def save_users_to_database(users_df):
-    """Save changes from the DataFrame back to the database."""
-    conn = get_db_connection()
-    try:
-        # First, get the current data to compare
-        current_data = pd.read_sql_query("SELECT id FROM users", conn)
-        current_ids = set(current_data['id'])
-        
-        # Get the IDs in the edited DataFrame
-        edited_ids = set(users_df['id'].dropna())
-        
-        # Find IDs to delete (in current but not in edited)
-        ids_to_delete = current_ids - edited_ids
-        
-        # Delete removed rows
-        if ids_to_delete:
-            placeholders = ','.join('?' * len(ids_to_delete))
-            conn.execute(f'DELETE FROM users WHERE id IN ({placeholders})', tuple(ids_to_delete))
-        
-        # Update or insert remaining rows
-        for _, row in users_df.iterrows():
-            if pd.notna(row['id']):
-                # Update existing row
-                conn.execute('''UPDATE users 
-                              SET username = ?, 
-                                  password_hash = ?, 
-                                  email = ?, 
-                                  created_at = ?
-                              WHERE id = ?''',
-                           (row['username'], row['password_hash'], 
-                            row['email'], row['created_at'],
-                            row['id']))
-            else:
-                # Insert new row
-                conn.execute('''INSERT INTO users 
-                              (username, password_hash, email, created_at)
-                              VALUES (?, ?, ?, ?)''',
-                           (row['username'], row['password_hash'], 
-                            row['email'], datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-        
-        conn.commit()
-        return True, "Changes saved successfully!"
-    except Exception as e:
-        conn.rollback()
-        return False, f"Error saving changes: {str(e)}"
-    finally:
-        conn.close()
+USER_UPDATE_SQL = 'UPDATE users SET username = ?, password_hash = ?, email = ?, created_at = ? WHERE id = ?'
+USER_INSERT_SQL = 'INSERT INTO users (username, password_hash, email, created_at) VALUES (?, ?, ?, ?)'
+
+def save_users_to_database(users_df, original_df):
+    """Save changes from the DataFrame back to the database.
+    
+    original_df is the page of users as loaded into the editor: only rows missing
+    from users_df are deleted, so users on other pages are left alone.
+    """
+    # Deletions are diffed against what was loaded - at most one page of ids
+    delete_ids = tuple(int(user_id) for user_id in set(original_df['id'].dropna()) - set(users_df['id'].dropna()))
+    
+    with borrow_connection() as conn:
+        try:
+            # One transaction for the whole save: a single commit, lock taken up front
+            begin_immediate(conn)
+            
+            # Delete rows removed in the editor
+            if delete_ids:
+                placeholders = ','.join('?' * len(delete_ids))
+                conn.execute(f'DELETE FROM users WHERE id IN ({placeholders})', delete_ids)
+            
+            # Update or insert remaining rows, one executemany per statement
+            has_id = users_df['id'].notna()
+            updates = users_df.loc[has_id, ['username', 'password_hash', 'email', 'created_at', 'id']].to_numpy(dtype=object)
+            conn.executemany(USER_UPDATE_SQL, [tuple(row) for row in updates])
+            
+            created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            inserts = users_df.loc[~has_id, ['username', 'password_hash', 'email']].to_numpy(dtype=object)
+            conn.executemany(USER_INSERT_SQL, [tuple(row) + (created_at,) for row in inserts])
+            
+            conn.commit()
+            get_existing_users.clear()
+            return True, "Changes saved successfully!"
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error saving changes: {str(e)}"
+
+# scrypt cost (16MB, tens of ms per hash) - cheap for one login, expensive per guess
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_SALT_BYTES = 16
+SCRYPT_KEY_BYTES = 32
+PASSWORD_HASH_PREFIX = 'scrypt$'
+
+def _scrypt(password, salt):
+    """Derive the scrypt key for a password and salt."""
+    return hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P,
+                          dklen=SCRYPT_KEY_BYTES)
 
 def hash_password(password):
-    """Hash a password using SHA-256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash a password with salted scrypt, as 'scrypt$<salt>$<key>' (base64)."""
+    salt = os.urandom(SCRYPT_SALT_BYTES)
+    key = _scrypt(password, salt)
+    return f"{PASSWORD_HASH_PREFIX}{base64.b64encode(salt).decode()}${base64.b64encode(key).decode()}"
+
+def check_password(password, stored_hash):
+    """Check a password against a stored scrypt hash or a legacy unsalted SHA-256 hex digest."""
+    if not stored_hash:
+        return False
+    
+    if stored_hash.startswith(PASSWORD_HASH_PREFIX):
+        salt_b64, key_b64 = stored_hash[len(PASSWORD_HASH_PREFIX):].split('$', 1)
+        key = _scrypt(password, base64.b64decode(salt_b64))
+        return hmac.compare_digest(key, base64.b64decode(key_b64))
+    
+    # Accounts registered before scrypt - rehashed on their next successful login
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored_hash)
+
+def _upgrade_password_hash(user_id, password):
+    """Replace a legacy SHA-256 hash with a scrypt hash after a successful login."""
+    from database_utils import use_supabase
+    
+    password_hash = hash_password(password)
+    try:
+        if use_supabase():
+            from supabase_utils import get_supabase_client
+            get_supabase_client().table('users').update({'password_hash': password_hash}).eq('id', user_id).execute()
+        else:
+            with borrow_connection() as conn:
+                conn.execute('UPDATE users SET password_hash = ? WHERE id = ?', (password_hash, user_id))
+                conn.commit()
+    except Exception:
+        pass  # The legacy hash still verifies; the upgrade is retried on the next login
 
 def check_email_exists(email):
     """Check if an email exists in the database."""
@@ -85,19 +122,27 @@ def check_email_exists(email):
             return False
     else:
         # SQLite fallback
-        conn = get_db_connection()
-        if not conn:
-            return False
-        c = conn.cursor()
-        try:
-            c.execute('SELECT id FROM users WHERE email = ?', (email,))
-            result = c.fetchone()
+        with borrow_connection() as conn:
+            result = conn.execute('SELECT id FROM users WHERE email = ?', (email,)).fetchone()
             return result is not None
-        finally:
-            conn.close()
+
+def _duplicate_user_messages(error):
+    """Map a users UNIQUE violation to (alert, message), or None if the error is something else."""
+    text = str(error)
+    if 'UNIQUE constraint failed' not in text and 'duplicate key' not in text and '23505' not in text:
+        return None
+    if 'username' in text:
+        return "Username already exists.", "Username already exists. Please choose a different username."
+    if 'email' in text:
+        return "Email already registered.", "Email already registered. Please use a different email."
+    return None
 
 def register_user(username, password, email=None):
-    """Register a new user using unified database system."""
+    """Register a new user using unified database system.
+    
+    Duplicate usernames and emails are caught by the table's UNIQUE constraints on
+    insert rather than checked up front, so registering is a single round trip.
+    """
     from database_utils import use_supabase
     
     # Validate input
@@ -105,80 +150,60 @@ def register_user(username, password, email=None):
         st.error("Username and password are required.")
         return False, "Username and password are required."
     
+    # No email is stored as NULL, which UNIQUE allows any number of times
+    email = email or None
+    
     # Hash the password
     password_hash = hash_password(password)
+    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     if use_supabase():
         from supabase_utils import get_supabase_client
         try:
             supabase = get_supabase_client()
             
-            # Check if username already exists
-            username_check = supabase.table('users').select('id').eq('username', username).execute()
-            if username_check.data:
-                st.error("Username already exists.")
-                return False, "Username already exists. Please choose a different username."
-            
-            # Check if email already exists (if provided)
-            if email:
-                email_check = supabase.table('users').select('id').eq('email', email).execute()
-                if email_check.data:
-                    st.error("Email already registered.")
-                    return False, "Email already registered. Please use a different email."
-            
             # Insert the new user
             user_data = {
                 'username': username,
                 'password_hash': password_hash,
                 'email': email,
-                'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                'created_at': created_at
             }
             
-            result = supabase.table('users').insert(user_data).execute()
+            supabase.table('users').insert(user_data).execute()
+            get_existing_users.clear()
             st.success("User registered successfully!")
             return True, "Registration successful! You can now login."
             
         except Exception as e:
+            duplicate = _duplicate_user_messages(e)
+            if duplicate:
+                st.error(duplicate[0])
+                return False, duplicate[1]
             st.error(f"Error during registration: {str(e)}")
             return False, f"Error during registration: {str(e)}"
     else:
         # SQLite fallback
         os.makedirs('data', exist_ok=True)
-        conn = get_db_connection()
-        if not conn:
-            return False, "Database connection failed"
-        c = conn.cursor()
-        
-        try:
-            # Check if username already exists
-            c.execute('SELECT id FROM users WHERE username = ?', (username,))
-            if c.fetchone():
-                st.error("Username already exists.")
-                return False, "Username already exists. Please choose a different username."
-            
-            # Check if email already exists (if provided)
-            if email:
-                c.execute('SELECT id FROM users WHERE email = ?', (email,))
-                if c.fetchone():
-                    st.error("Email already registered.")
-                    return False, "Email already registered. Please use a different email."
-            
-            # Insert the new user
-            c.execute('''INSERT INTO users (username, password_hash, email, created_at)
-                         VALUES (?, ?, ?, ?)''', 
-                         (username, password_hash, email, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-            
-            conn.commit()
-            st.success("User registered successfully!")
-            return True, "Registration successful! You can now login."
-        except sqlite3.IntegrityError as e:
-            st.error(f"Database error: {str(e)}")
-            return False, f"Database error: {str(e)}"
-        except Exception as e:
-            st.error(f"Error during registration: {str(e)}")
-            return False, f"Error during registration: {str(e)}"
-        finally:
-            conn.close()
+        with borrow_connection() as conn:
+            try:
+                # Insert the new user
+                conn.execute(USER_INSERT_SQL, (username, password_hash, email, created_at))
+                
+                conn.commit()
+                get_existing_users.clear()
+                st.success("User registered successfully!")
+                return True, "Registration successful! You can now login."
+            except sqlite3.IntegrityError as e:
+                duplicate = _duplicate_user_messages(e)
+                if duplicate:
+                    st.error(duplicate[0])
+                    return False, duplicate[1]
+                st.error(f"Database error: {str(e)}")
+                return False, f"Database error: {str(e)}"
+            except Exception as e:
+                st.error(f"Error during registration: {str(e)}")
+                return False, f"Error during registration: {str(e)}"
 
 def verify_user(username, password):
     """Verify user credentials and return detailed status using unified database system."""
@@ -200,9 +225,9 @@ def verify_user(username, password):
             stored_hash = user_data['password_hash']
             email = user_data['email']
             
-            password_hash = hash_password(password)
-            
-            if password_hash == stored_hash:
+            if check_password(password, stored_hash):
+                if not stored_hash.startswith(PASSWORD_HASH_PREFIX):
+                    _upgrade_password_hash(user_id, password)
                 return True, "success", user_id
             else:
                 return False, "wrong_password", None
@@ -212,23 +237,20 @@ def verify_user(username, password):
             return False, "error", None
     else:
         # SQLite fallback
-        conn = get_db_connection()
-        if not conn:
-            return False, "error", None
-        c = conn.cursor()
-        
         try:
-            # First check if username exists
-            c.execute('SELECT id, password_hash, email FROM users WHERE username = ?', (username,))
-            result = c.fetchone()
+            with borrow_connection() as conn:
+                # First check if username exists
+                result = conn.execute('SELECT id, password_hash, email FROM users WHERE username = ?',
+                                      (username,)).fetchone()
             
             if result is None:
                 return False, "username_not_found", None
             
             user_id, stored_hash, email = result
-            password_hash = hash_password(password)
             
-            if password_hash == stored_hash:
+            if check_password(password, stored_hash):
+                if not stored_hash.startswith(PASSWORD_HASH_PREFIX):
+                    _upgrade_password_hash(user_id, password)
                 return True, "success", user_id
             else:
                 return False, "wrong_password", None
@@ -236,8 +258,6 @@ def verify_user(username, password):
         except Exception as e:
             st.error(f"Error during verification: {str(e)}")
             return False, "error", None
-        finally:
-            conn.close()
 
 def show_main_menu():
     """Display the main menu after successful login."""
@@ -261,15 +281,31 @@ def show_main_menu():
     # Show selected page
     menu_options[selected_page]()
 
-def get_existing_users():
-    """Get list of existing users from the database using unified database system."""
+USERS_PAGE_SIZE = 100
+
+# Registration dates are formatted by SQLite while scanning, not per row in pandas
+USERS_PAGE_SQL = (
+    'SELECT id, username AS "Username", email AS "Email", '
+    'strftime(\'%Y-%m-%d %H:%M:%S\', created_at) AS "Registration Date" '
+    'FROM users ORDER BY created_at DESC LIMIT ? OFFSET ?'
+)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_existing_users(page=0, page_size=USERS_PAGE_SIZE):
+    """Get one page of existing users from the database using unified database system.
+    
+    Cached for 30 seconds so reruns don't re-query; registering or saving users clears it.
+    """
     from database_utils import use_supabase
     
+    offset = page * page_size
+    
     if use_supabase():
         from supabase_utils import get_supabase_client
         try:
             supabase = get_supabase_client()
-            result = supabase.table('users').select('id, username, email, created_at').order('created_at', desc=True).execute()
+            result = supabase.table('users').select('id, username, email, created_at') \
+                .order('created_at', desc=True).range(offset, offset + page_size - 1).execute()
             
             if result.data:
                 # Convert to DataFrame
@@ -284,20 +320,8 @@ def get_existing_users():
             return pd.DataFrame(columns=['id', 'Username', 'Email', 'Registration Date'])
     else:
         # SQLite fallback
-        conn = get_db_connection()
-        if not conn:
-            return pd.DataFrame(columns=['id', 'Username', 'Email', 'Registration Date'])
-        c = conn.cursor()
-        
-        try:
-            c.execute('SELECT id, username, email, created_at FROM users ORDER BY created_at DESC')
-            users = c.fetchall()
-            # Convert to DataFrame
-            df = pd.DataFrame(users, columns=['id', 'Username', 'Email', 'Registration Date'])
-            df['Registration Date'] = pd.to_datetime(df['Registration Date']).dt.strftime('%Y-%m-%d %H:%M:%S')
-            return df
-        finally:
-            conn.close()
+        with borrow_connection() as conn:
+            return pd.read_sql_query(USERS_PAGE_SQL, conn, params=(page_size, offset))
 
 def show_login_page():
     """Display the login page."""
@@ -3,11 +3,19 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from utils import read_secrets, init_openai_client
+import streamlit as st
+import atexit
+import threading
 import time
+import json
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from utils import get_db_connection
-from typing import Dict, Tuple
+from database_utils import borrow_connection
+from typing import Dict, List, Tuple
 
 # Token counting for API limits
 try:
@@ -16,27 +24,96 @@ try:
 except ImportError:
     TIKTOKEN_AVAILABLE = False
 
-def open_webpage(url):
+# Page loads served by one browser before it is restarted, so memory held by
+# Chrome across many job pages is released periodically
+DRIVER_MAX_USES = 50
+_driver_uses = 0
+
+# One browser serves every session and WebDriver isn't thread-safe, so a page load,
+# the reads made from it and recycling the browser all happen under this lock
+_driver_lock = threading.Lock()
+
+# Upper bounds on a page load and on injected scripts, so one slow site can't hold a session
+PAGE_LOAD_TIMEOUT_SECONDS = 15
+SCRIPT_TIMEOUT_SECONDS = 10
+
+@st.cache_resource
+def get_driver():
     """
-    Open a webpage using Selenium WebDriver.
+    Get the shared headless Chrome WebDriver, starting it on first use.
+    
+    The browser is kept alive across scrapes and Streamlit reruns so each
+    scrape only pays for a page load, not a browser start; it is quit at exit.
     
-    Args:
-        url (str): The URL of the webpage to open
-        
     Returns:
         webdriver.Chrome: The Chrome WebDriver instance
     """
     # Set up Chrome options
     options = Options()
-    options.add_argument("--start-fullscreen")  # Launch in full screen
-    #options.add_argument('--headless')  # Run in headless mode
+    options.add_argument("--headless=new")  # No window to composite
+    options.add_argument("--window-size=1920,1080")
+    # Only page text is scraped - don't fetch or decode images. Stylesheets still
+    # load: without them hidden elements would leak into the innerText we select on
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2
+    })
     
     # Create and configure the driver using Selenium Manager
     driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT_SECONDS)
+    driver.set_script_timeout(SCRIPT_TIMEOUT_SECONDS)
+    atexit.register(driver.quit)
+    return driver
+
+@contextmanager
+def open_webpage(url):
+    """
+    Open a webpage in the shared Selenium WebDriver and hold the browser for the with-block.
+    
+    Other sessions wait until the block exits, so the page read inside it is the
+    one that was opened.
+    
+    Args:
+        url (str): The URL of the webpage to open
+        
+    Yields:
+        webdriver.Chrome: The Chrome WebDriver instance, or None if the page failed to load
+    """
+    with _driver_lock:
+        yield _load_page(url)
+
+def _load_page(url):
+    """Navigate the shared driver to url, recycling it when due; the caller holds _driver_lock."""
+    global _driver_uses
+    driver = get_driver()
+    
+    # Recycle the browser after DRIVER_MAX_USES page loads
+    if _driver_uses >= DRIVER_MAX_USES:
+        atexit.unregister(driver.quit)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+        get_driver.clear()
+        driver = get_driver()
+        _driver_uses = 0
+    
+    # Start a fresh browser if the cached one has died or been quit
+    try:
+        driver.current_url
+    except WebDriverException:
+        get_driver.clear()
+        driver = get_driver()
+        _driver_uses = 0
+    _driver_uses += 1
     
     try:
-        # Navigate to the URL
-        driver.get(url)
+        # Navigate to the URL; on a slow page stop loading and scrape what has rendered
+        try:
+            driver.get(url)
+        except TimeoutException:
+            driver.execute_script("window.stop();")
         print(f"Successfully opened: {url}")
         print(f"Page title: {driver.title}")
         
@@ -56,7 +133,6 @@ def open_webpage(url):
         return driver
     except Exception as e:
         print(f"Error opening webpage: {str(e)}")
-        driver.quit()
         return None
 
 def get_page_html(driver):
@@ -318,74 +394,191 @@ def validate_and_prepare_text(text: str, max_tokens: int = 12000) -> Tuple[str,
     
     return processed_text, metadata
 
-def scraper_openai_agent(text):
+EXTRACTION_MODEL = "gpt-4o-mini"
+# Input per chunk is kept well under the output budget: a chunk that is all
+# description is copied back word-for-word, plus JSON escaping (gpt-4o-mini allows 16k out)
+CHUNK_MAX_TOKENS = 3000
+CHUNK_OUTPUT_TOKENS = 8000
+# Pages are truncated to MAX_CHUNKS chunks' worth of tokens, bounding OpenAI calls per page
+MAX_CHUNKS = 4
+MAX_CHUNK_WORKERS = 4
+
+EXTRACTION_FIELDS = ("Company Name", "Job Title", "Job Description", "Job Location", "Job Salary")
+
+
+def _split_on_token_boundaries(text: str, max_tokens: int) -> List[str]:
+    """Hard-split text into pieces of at most max_tokens tokens."""
+    if TIKTOKEN_AVAILABLE:
+        try:
+            encoding = tiktoken.encoding_for_model(EXTRACTION_MODEL)
+            tokens = encoding.encode(text)
+            return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+        except Exception:
+            pass
+    
+    # Without tiktoken, count_tokens estimates ~4 characters per token
+    step = max_tokens * 4
+    return [text[i:i + step] for i in range(0, len(text), step)]
+
+
+def split_text_into_chunks(text: str, max_tokens: int = CHUNK_MAX_TOKENS) -> List[str]:
     """
-    Extract job information from text using OpenAI API with proper token management.
+    Split text into chunks of at most max_tokens, breaking on paragraph boundaries.
+    
+    Args:
+        text (str): Input text to split
+        max_tokens (int): Maximum tokens per chunk
+        
+    Returns:
+        List[str]: Ordered list of text chunks
     """
-    # Initialize OpenAI client
-    client = init_openai_client()
-    if client is None:
-        print("OpenAI client initialization failed. The AI Chat Bot feature will be disabled.")
-        return None
-
-    # Validate and prepare text
-    processed_text, metadata = validate_and_prepare_text(text, max_tokens=12000)
+    chunks = []
+    current = []
+    current_tokens = 0
     
-    # Log token information
-    print(f"Input text: {metadata['original_length']} chars, {metadata['token_count']} tokens")
-    if metadata['truncated']:
-        print("⚠️ Warning: Input text was truncated due to length limits")
+    for paragraph in text.split('\n\n'):
+        paragraph_tokens = count_tokens(paragraph, EXTRACTION_MODEL)
+        
+        # A single oversized paragraph is hard-split on its own
+        if paragraph_tokens > max_tokens:
+            if current:
+                chunks.append('\n\n'.join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split_on_token_boundaries(paragraph, max_tokens))
+            continue
+        
+        if current and current_tokens + paragraph_tokens > max_tokens:
+            chunks.append('\n\n'.join(current))
+            current, current_tokens = [], 0
+        
+        current.append(paragraph)
+        current_tokens += paragraph_tokens
+    
+    if current:
+        chunks.append('\n\n'.join(current))
+    
+    return chunks
+
 
-    # Define the system message (optimized for token efficiency)
+def _extract_chunk(client, chunk: str, index: int, total: int) -> Dict:
+    """Extract job fields from a single chunk of page text."""
     system_message = """
-    You are an intelligent extraction agent. Extract detailed job information from the provided text:
+    You are an intelligent extraction agent. You will receive one part of a job listing page.
+    Extract whatever job information appears in THIS part:
 
-    REQUIRED FIELDS:
     - Company Name
-    - Job Title  
-    - Job Description - CRITICAL: Include the COMPLETE job description with ALL details:
-        * Company overview and role details
-        * All responsibilities and requirements
-        * Skills, qualifications, and experience needed
-        * Compensation, benefits, and perks
-        * Location and work arrangement details
-        * Application instructions and deadlines
-        * Any additional relevant information
-        
-        PRESERVE THE ENTIRE DESCRIPTION - DO NOT TRUNCATE OR SUMMARIZE!
-        
+    - Job Title
+    - Job Description - Copy every part of the job description found in this text word-for-word:
+        company overview, responsibilities, requirements, skills, compensation, benefits,
+        location and work arrangement, application instructions. DO NOT SUMMARIZE.
     - Job Location - Format: "City, Country" (e.g., "New York, USA")
-    - Job Salary - Include full range if available (e.g., "$100,000 - $120,000 per year") or "Not Listed"
+    - Job Salary - Include full range if available (e.g., "$100,000 - $120,000 per year")
 
+    Use an empty string for any field that does not appear in this part.
     Return ONLY a valid JSON dictionary with these exact keys: "Company Name", "Job Title", "Job Description", "Job Location", "Job Salary".
     """
 
-    # Define the user message with the content
-    truncation_note = " [NOTE: Input text was truncated due to length limits]" if metadata["truncated"] else ""
     user_message = f"""
-    Please extract the job information from this text. Ensure the Job Description field contains the COMPLETE, UNTRUNCATED description:
+    Part {index + 1} of {total} of the job listing:
 
-    {processed_text}{truncation_note}
+    {chunk}
     """
 
+    response = client.chat.completions.create(
+        model=EXTRACTION_MODEL,
+        messages=[
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message}
+        ],
+        max_tokens=CHUNK_OUTPUT_TOKENS,
+        temperature=0.1,  # Low temperature for consistent, factual extraction
+        response_format={"type": "json_object"}  # Guarantees a parseable JSON object
+    )
+
+    choice = response.choices[0]
+    if choice.finish_reason != "length":
+        try:
+            return json.loads(choice.message.content or "")
+        except ValueError:
+            pass
+    
+    # Output was cut off mid-object (or unparseable): keep this chunk's own text as
+    # its description rather than a half-finished JSON string
+    print(f"Extraction of part {index + 1} of {total} was incomplete ({choice.finish_reason}); using its raw text")
+    return {"Job Description": chunk}
+
+
+def merge_chunk_results(results: List[Dict]) -> Dict:
+    """
+    Merge per-chunk extractions into a single job record.
+    
+    Scalar fields are decided by majority vote across chunks; description
+    fragments are concatenated in chunk order.
+    
+    Args:
+        results (List[Dict]): Chunk extractions in original text order
+        
+    Returns:
+        Dict: Merged job information
+    """
+    merged = {}
+    for field in EXTRACTION_FIELDS:
+        values = [str(result.get(field) or '').strip() for result in results]
+        if field == "Job Description":
+            merged[field] = "\n\n".join(value for value in values if value)
+            continue
+        votes = Counter(value for value in values if value and value != "Not Listed")
+        merged[field] = votes.most_common(1)[0][0] if votes else "Not Listed"
+    return merged
+
+
+def scraper_openai_agent(text):
+    """
+    Extract job information from text using OpenAI API with chunked map-reduce.
+    
+    Long pages are split into chunks of at most CHUNK_MAX_TOKENS tokens, each
+    chunk is extracted in parallel, and the fragments are merged back together.
+    Text beyond MAX_CHUNKS chunks' worth of tokens is dropped.
+    """
+    # Initialize OpenAI client
+    client = init_openai_client()
+    if client is None:
+        print("OpenAI client initialization failed. The AI Chat Bot feature will be disabled.")
+        return None
+
+    # Cap the input, then the chunk count - paragraph packing can leave chunks part-full
+    processed_text, metadata = validate_and_prepare_text(text, max_tokens=MAX_CHUNKS * CHUNK_MAX_TOKENS)
+    chunks = split_text_into_chunks(processed_text)[:MAX_CHUNKS]
+    
+    # Log token information
+    print(f"Input text: {metadata['original_length']} chars, {metadata['token_count']} tokens"
+          f"{' (truncated)' if metadata['truncated'] else ''}, {len(chunks)} chunk(s)")
+
     try:
-        # Generate AI response using OpenAI API with proper token limits
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo-16k",  # Use 16k model for larger context
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
-            ],
-            max_tokens=8000,  # Allow for longer responses
-            temperature=0.1   # Low temperature for consistent, factual extraction
-        )
+        with ThreadPoolExecutor(max_workers=min(MAX_CHUNK_WORKERS, len(chunks) or 1)) as executor:
+            results = list(executor.map(
+                lambda item: _extract_chunk(client, item[1], item[0], len(chunks)),
+                enumerate(chunks)
+            ))
 
-        return response.choices[0].message.content
+        return json.dumps(merge_chunk_results(results))
         
     except Exception as e:
         print(f"Error in OpenAI API call: {str(e)}")
         return f"Error: {str(e)}"
 
+# Returns [text, className, element] for the class-bearing div with the longest visible text
+LONGEST_DIV_SCRIPT = """
+let best = ['', '', null];
+for (const div of document.getElementsByTagName('div')) {
+    const cls = div.getAttribute('class');
+    if (!cls) continue;
+    const text = div.innerText.trim();
+    if (text.length > best[0].length) best = [text, cls, div];
+}
+return best;
+"""
+
 def get_longest_text_content(driver):
     """
     Get the div element with the longest text content, which is likely to be the job description.
@@ -406,69 +599,45 @@ def get_longest_text_content(driver):
         # Small wait for content
         time.sleep(1)
         
-        # Find all div elements
-        divs = driver.find_elements(By.TAG_NAME, "div")
+        # Scan the divs inside the browser - one WebDriver round trip instead of
+        # two per div - skipping those with blank text or a blank class name
+        text, class_name, element = driver.execute_script(LONGEST_DIV_SCRIPT)
         
-        # Track the longest text
-        longest_text = {"text": "", "class": "", "element": None}
-        
-        for div in divs:
-            text = div.text.strip()
-            class_name = div.get_attribute("class")
-            
-            # Skip if text is blank or class name is blank
-            if not text or not class_name:
-                continue
-                
-            # Track the longest text
-            if len(text) > len(longest_text["text"]):
-                longest_text = {
-                    "text": text,
-                    "class": class_name,
-                    "element": div
-                }
-        
-        return longest_text
+        return {"text": text, "class": class_name, "element": element}
     except Exception as e:
         print(f"Error getting longest text content: {str(e)}")
         return None
     
 def save_job_to_database(job_details):
     """Save job details to the database."""
-    conn = get_db_connection()
-    c = conn.cursor()
-    
     try:
-        c.execute('''INSERT INTO jobs 
-                    (company_name, job_title, job_description, application_url,
-                     status, sentiment, notes, date_added)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                 (job_details.get('company_name', ''),
-                  job_details.get('job_title', ''),
-                  job_details.get('job_description', ''),
-                  job_details.get('job_url', ''),
-                  job_details.get('application_status', 'Not Applied'),
-                  job_details.get('sentiment', 'Neutral'),
-                  job_details.get('notes', ''),
-                  datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-        conn.commit()
+        with borrow_connection() as conn:
+            conn.execute('''INSERT INTO jobs 
+                        (company_name, job_title, job_description, application_url,
+                         status, sentiment, notes, date_added)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                     (job_details.get('company_name', ''),
+                      job_details.get('job_title', ''),
+                      job_details.get('job_description', ''),
+                      job_details.get('job_url', ''),
+                      job_details.get('application_status', 'Not Applied'),
+                      job_details.get('sentiment', 'Neutral'),
+                      job_details.get('notes', ''),
+                      datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            conn.commit()
         return True, "Job details saved successfully!"
     except Exception as e:
         return False, f"Error saving job to database: {str(e)}"
-    finally:
-        conn.close()
 
 # Test the functions
 if __name__ == "__main__":
     # Test with Google
-    driver = open_webpage("https://www.google.com")
-    if driver:
-        # Get div elements with text
-        div_elements = get_div_elements_with_text(driver)
-        if div_elements:
-            # Format for AI parsing
-            ai_input = format_for_ai_parsing(div_elements)
-            print("\nFormatted text for AI parsing:")
-            print(ai_input)
-        
-        driver.quit() 
\ No newline at end of file
+    with open_webpage("https://www.google.com") as driver:
+        if driver:
+            # Get div elements with text
+            div_elements = get_div_elements_with_text(driver)
+            if div_elements:
+                # Format for AI parsing
+                ai_input = format_for_ai_parsing(div_elements)
+                print("\nFormatted text for AI parsing:")
+                print(ai_input) 
\ No newline at end of file
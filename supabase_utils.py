@@ -5,12 +5,18 @@ Provides PostgreSQL database operations for Streamlit Cloud.
 
 import streamlit as st
 import pandas as pd
+import functools
 from datetime import datetime
 from supabase import create_client, Client
 import os
 
-def get_supabase_client() -> Client:
-    """Get Supabase client connection."""
+@functools.lru_cache(maxsize=1)
+def get_supabase_credentials():
+    """Resolve the Supabase URL and API key once per process.
+    
+    Returns:
+        tuple: (supabase_url, supabase_key), either of which may be None
+    """
     supabase_url = None
     supabase_key = None
     
@@ -39,6 +45,20 @@ def get_supabase_client() -> Client:
             # toml package not available or file read error
             pass
     
+    supabase_url = supabase_url.strip() if supabase_url else None
+    supabase_key = supabase_key.strip() if supabase_key else None
+    return supabase_url or None, supabase_key or None
+
+@st.cache_resource(show_spinner=False)
+def get_supabase_client() -> Client:
+    """Get Supabase client connection.
+    
+    The client is held as a Streamlit resource, created once per process and kept
+    across module reloads, so its PostgREST HTTP session (and the keep-alive
+    connections in it) is reused by every query and session.
+    """
+    supabase_url, supabase_key = get_supabase_credentials()
+    
     if not supabase_url or not supabase_key:
         raise ValueError("Supabase credentials not found in secrets, environment variables, or secrets.toml")
     
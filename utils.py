@@ -89,7 +89,7 @@ def get_db_connection():
     """Get database connection - DEPRECATED: Use database_utils functions instead."""
     # This function is deprecated and maintained only for backwards compatibility
     # New code should use database_utils.py functions which support both SQLite and Supabase
-    from database_utils import use_supabase
+    from database_utils import use_supabase, get_db_connection as db_utils_get_db_connection
     
     if use_supabase():
         # For Supabase, this function shouldn't be used - use database_utils functions
@@ -97,8 +97,8 @@ def get_db_connection():
         st.warning("⚠️ Using deprecated get_db_connection() with Supabase. Please use database_utils functions.")
         return None
     else:
-        # For SQLite compatibility
-        return sqlite3.connect('data/jobs.db')
+        # For SQLite compatibility (same tuned connection as database_utils)
+        return db_utils_get_db_connection()
 
 def init_db():
     """Initialize the database with the required tables - DEPRECATED: Use database_utils.init_db() instead."""